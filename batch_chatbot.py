@@ -0,0 +1,148 @@
+# Classificação de intenções em lote para análises e QA
+#
+# Lê um JSONL com uma pergunta por linha ({"user_message": "...", "id": opcional})
+# e escreve um JSONL com a intenção detectada e a camada da cascata que a
+# resolveu, lote a lote. A última linha traz as estatísticas por camada.
+# Uso: python batch_chatbot.py [--batch-size 256] [--n-process 1] [--bert-batch-size 32] < perguntas.jsonl > intencoes.jsonl
+# A mesma função atende o endpoint POST /chatbot/batch, que primeiro recebe o corpo
+# (até MAX_BATCH_BYTES, em arquivo temporário) e depois o lê linha a linha.
+
+import argparse
+import sys
+import tempfile
+import time
+from collections import Counter, deque
+from json import dumps, loads
+from os import environ
+
+import anyio
+
+from chatbot import classificar_em_lote
+
+MAX_BATCH_LINES = int(environ.get("MAX_BATCH_LINES", "100000"))
+MAX_BATCH_BYTES = int(environ.get("MAX_BATCH_BYTES", str(64 * 1024 * 1024)))
+MAX_LINE_BYTES = 64 * 1024
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+CAMADAS = ["lematizacao", "correcao", "embeddings", "bertimbau", "nao_identificada"]
+
+
+async def receber_corpo(chunks):
+    # Lê o corpo inteiro no endpoint, antes da resposta começar: ler request.stream() de dentro
+    # do StreamingResponse disputa o receive com o listen_for_disconnect do Starlette (ASGI < 2.4)
+    # e pode perder chunks. Acima de SPOOL_MEMORY_BYTES o corpo vai para disco; acima de
+    # MAX_BATCH_BYTES retorna None.
+    arquivo = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    total = 0
+    try:
+        async for chunk in chunks:
+            total += len(chunk)
+            if total > MAX_BATCH_BYTES:
+                arquivo.close()
+                return None
+            if getattr(arquivo, "_rolled", True):
+                await anyio.to_thread.run_sync(arquivo.write, chunk)
+            else:
+                arquivo.write(chunk)
+    except BaseException:
+        arquivo.close()
+        raise
+    arquivo.seek(0)
+    return arquivo
+
+
+def linhas_do_arquivo(arquivo):
+    # Divide o corpo em linhas sem carregá-lo inteiro; linhas acima de MAX_LINE_BYTES viram None
+    try:
+        while linha := arquivo.readline(MAX_LINE_BYTES + 1):
+            if linha.endswith(b"\n"):
+                linha = linha[:-1]
+            elif len(linha) > MAX_LINE_BYTES:
+                # Descarta o restante da linha longa sem guardá-lo
+                while (resto := arquivo.readline(MAX_LINE_BYTES + 1)) and not resto.endswith(b"\n"):
+                    pass
+                yield None
+                continue
+            yield linha.decode(errors="replace")
+    finally:
+        arquivo.close()
+
+
+def classificar_jsonl(linhas, batch_size=256, n_process=1, bert_batch_size=32, max_linhas=None):
+    inicio = time.monotonic()
+    estatisticas = Counter({camada: 0 for camada in CAMADAS})
+    erros = []
+    invalidas = 0
+    excedeu = False
+    pendentes = deque()
+
+    def perguntas():
+        nonlocal invalidas, excedeu
+        for numero, linha in enumerate(linhas, 1):
+            if max_linhas is not None and numero > max_linhas:
+                erros.append({"linha": numero, "erro": f"Limite de {max_linhas} linhas excedido; o restante foi ignorado"})
+                excedeu = True
+                return
+            if linha is None:
+                erros.append({"linha": numero, "erro": f"Linha inválida: maior que {MAX_LINE_BYTES} bytes"})
+                invalidas += 1
+                continue
+            if not linha.strip():
+                continue
+            try:
+                item = loads(linha)
+                pergunta = item["user_message"]
+                if not isinstance(pergunta, str):
+                    raise TypeError
+            except (ValueError, KeyError, TypeError):
+                erros.append({"linha": numero, "erro": "Linha inválida: esperado {\"user_message\": \"...\"}"})
+                invalidas += 1
+                continue
+            pendentes.append((numero, item.get("id")))
+            yield pergunta
+
+    def erros_pendentes():
+        while erros:
+            yield dumps(erros.pop(0), ensure_ascii=False) + "\n"
+
+    for lote in classificar_em_lote(perguntas(), batch_size, n_process, bert_batch_size):
+        yield from erros_pendentes()
+        for pergunta, intencao, camada in lote:
+            numero, id_pergunta = pendentes.popleft()
+            estatisticas[camada or "nao_identificada"] += 1
+            resultado = {"linha": numero, "user_message": pergunta, "intencao": intencao, "camada": camada}
+            if id_pergunta is not None:
+                resultado["id"] = id_pergunta
+            yield dumps(resultado, ensure_ascii=False) + "\n"
+    # Linhas inválidas ao final do arquivo só aparecem depois do último lote
+    yield from erros_pendentes()
+
+    estatisticas = dict(estatisticas)
+    yield dumps({
+        "estatisticas": {
+            "total": sum(estatisticas.values()),
+            "camadas": estatisticas,
+            "invalidas": invalidas,
+            "limite_excedido": excedeu,
+            "segundos": round(time.monotonic() - inicio, 3),
+        }
+    }, ensure_ascii=False) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Classifica perguntas em lote a partir de um JSONL na entrada padrão.")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--n-process", type=int, default=1, help="processos do spaCy (nlp.pipe)")
+    parser.add_argument("--bert-batch-size", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    linha = ""
+    for linha in classificar_jsonl(sys.stdin, args.batch_size, args.n_process, args.bert_batch_size):
+        sys.stdout.write(linha)
+        sys.stdout.flush()
+    # A última linha são as estatísticas; repetidas no stderr para quem redireciona a saída
+    print(linha, end="", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# Armazenamento dos gráficos pré-calculados
+#
+# Os gráficos ficam em disco (CHART_STORE_DIR) para serem compartilhados entre os
+# workers do gunicorn e o processo de pré-cálculo (precompute.py):
+#   <dir>/<instituicao>/<grafico>.b64   gráfico em base64, como retornado por graphs.py
+#   <dir>/<instituicao>/requests-<hora>.log
+#       um byte por requisição naquela hora (tamanho = contagem), usado para
+#       priorizar o pré-cálculo. Os arquivos só recebem append; nenhum processo
+#       os trunca, arquivos de horas antigas são apenas apagados.
+
+import os
+import time
+from os import environ
+
+CHART_STORE_DIR = environ.get("CHART_STORE_DIR", "/tmp/docentify-charts")
+CHART_TTL = int(environ.get("CHART_TTL", "900"))
+REQUEST_RETENTION = int(environ.get("REQUEST_RETENTION", "172800"))
+BUCKET_SECONDS = 3600
+
+
+def _institution_dir(institution_id):
+    # O id vem da URL; só ids numéricos viram diretório (evita "..", etc.)
+    if not str(institution_id).isdigit():
+        raise ValueError(f"institution_id inválido: {institution_id!r}")
+    return os.path.join(CHART_STORE_DIR, str(institution_id))
+
+
+def _chart_path(graph, institution_id):
+    return os.path.join(_institution_dir(institution_id), f"{graph}.b64")
+
+
+def get_chart(graph, institution_id, max_age=CHART_TTL):
+    try:
+        path = _chart_path(graph, institution_id)
+        if time.time() - os.path.getmtime(path) > max_age:
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+    except (OSError, ValueError):
+        return None
+
+
+def chart_age(graph, institution_id):
+    try:
+        return time.time() - os.path.getmtime(_chart_path(graph, institution_id))
+    except (OSError, ValueError):
+        return None
+
+
+def save_chart(graph, institution_id, data):
+    os.makedirs(_institution_dir(institution_id), exist_ok=True)
+    path = _chart_path(graph, institution_id)
+    # Escrita atômica: leitores nunca veem um arquivo pela metade
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _bucket_path(institution_id, bucket):
+    return os.path.join(_institution_dir(institution_id), f"requests-{bucket}.log")
+
+
+def _buckets(institution_id):
+    # [(bucket, caminho)] dos contadores por hora da instituição
+    diretorio = _institution_dir(institution_id)
+    buckets = []
+    for nome in os.listdir(diretorio):
+        if nome.startswith("requests-") and nome.endswith(".log"):
+            try:
+                buckets.append((int(nome[len("requests-"):-len(".log")]), os.path.join(diretorio, nome)))
+            except ValueError:
+                continue
+    return buckets
+
+
+def _delete_buckets_before(institution_id, limite):
+    for bucket, path in _buckets(institution_id):
+        if (bucket + 1) * BUCKET_SECONDS <= limite:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def record_request(institution_id):
+    os.makedirs(_institution_dir(institution_id), exist_ok=True)
+    agora = time.time()
+    path = _bucket_path(institution_id, int(agora // BUCKET_SECONDS))
+    nova_hora = not os.path.exists(path)
+    # Append de um byte é atômico entre processos; o tamanho do arquivo é a contagem
+    with open(path, "ab") as f:
+        f.write(b".")
+    # Na primeira requisição de cada hora a própria API apaga as horas vencidas,
+    # para os contadores não crescerem sem limite mesmo sem o precompute.py rodando
+    if nova_hora:
+        _delete_buckets_before(institution_id, agora - REQUEST_RETENTION)
+
+
+def request_counts(window):
+    # Retorna {instituicao: requisicoes nas horas que caem na janela} e apaga as horas fora dela
+    limite = time.time() - window
+    contagens = {}
+    if not os.path.isdir(CHART_STORE_DIR):
+        return contagens
+    for institution_id in os.listdir(CHART_STORE_DIR):
+        try:
+            _delete_buckets_before(institution_id, limite)
+            total = 0
+            for bucket, path in _buckets(institution_id):
+                try:
+                    total += os.path.getsize(path)
+                except OSError:
+                    continue
+        except (OSError, ValueError):
+            continue
+        if total:
+            contagens[institution_id] = total
+    return contagens
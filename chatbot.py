@@ -7,21 +7,27 @@ from transformers import AutoTokenizer, TFAutoModelForSequenceClassification
 import tensorflow as tf
 from rapidfuzz import process
 import spacy
+from functools import lru_cache
+from itertools import islice, tee
 from os import environ
+from db import connect_to_db
+from sql_queries import CERTIFICADO_QUERY, PROGRESSO_QUERY
+from session_store import get_session, normalize_question, save_session
 
 # Carregar modelo spaCy para português
 nlp = spacy.load("pt_core_news_sm")
 
 # Função para lematizar as palavras usando spaCy
 def lematizar(texto):
-    doc = nlp(texto.lower())
-    return [token.lemma_ for token in doc if not token.is_punct and not token.is_space]
+    return lemas_do_doc(nlp(texto.lower()))
 
 
-def connect_to_db(host, port, user, password, db_name):
-    return pymysql.connect(host=host, port=int(port), user=user, password=password, database=db_name, ssl={"teste": True})
+def lemas_do_doc(doc):
+    return [token.lemma_ for token in doc if not token.is_punct and not token.is_space]
 
 
+# Modelos carregados uma única vez por processo
+@lru_cache(maxsize=1)
 def inicializar_modelos():
     # Carregamento dos modelos
     modelo_embeddings = SentenceTransformer("sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
@@ -66,15 +72,37 @@ def inicializar_modelos():
 
 # Consulta ao banco
 
+def conectar_bd():
+    return connect_to_db(environ['DB_HOST'], environ['DB_PORT'], environ['DB_USER'], environ['DB_PASSWORD'], environ['DB_NAME'])
+
 def consultar_bd(query, params=None):
-    conn = connect_to_db(environ['DB_HOST'], environ['DB_PORT'], environ['DB_USER'], environ['DB_PASSWORD'], environ['DB_NAME'])
+    conn = conectar_bd()
     with conn.cursor() as cursor:
         cursor.execute(query, params)
         return cursor.fetchall()
 
+# Cursor sem buffer: as linhas chegam conforme o servidor as produz (chatbot_stream.py)
+def consultar_bd_em_fluxo(conn, query, params=None):
+    try:
+        with conn.cursor(pymysql.cursors.SSCursor) as cursor:
+            cursor.execute(query, params)
+            yield from cursor
+    finally:
+        conn.close()
+
+# KILL QUERY precisa de outra conexão: a original está bloqueada esperando o servidor
+def cancelar_consulta(conn):
+    outra = conectar_bd()
+    try:
+        with outra.cursor() as cursor:
+            cursor.execute("KILL QUERY %s", (conn.thread_id(),))
+    finally:
+        outra.close()
+
 # Detecção por lematização com spaCy
-def detectar_por_lematizacao(texto, lista_intencoes, lemas_por_intencao):
-    lemas = lematizar(texto)
+def detectar_por_lematizacao(texto, lista_intencoes, lemas_por_intencao, lemas=None):
+    if lemas is None:
+        lemas = lematizar(texto)
     scores = {intencao: 0 for intencao in lista_intencoes}
     for intencao, lemas_alvo in lemas_por_intencao.items():
         for lema in lemas:
@@ -108,72 +136,128 @@ def buscar_intencao_com_bertimbau(pergunta, modelo_bertimbau, tokenizer_bertimba
     prob = tf.nn.softmax(outputs.logits, axis=-1).numpy()[0][pred]
     return lista_intencoes[pred] if prob > 0.7 else None
 
+# Camadas embeddings e BERT em lote: uma chamada ao modelo por lote de perguntas
+def buscar_intencoes_com_embeddings(perguntas, modelo_embeddings, lista_intencoes, intencoes_embeddings, batch_size=256):
+    similaridade = cosine_similarity(modelo_embeddings.encode(perguntas, batch_size=batch_size), intencoes_embeddings)
+    return [lista_intencoes[s.argmax()] if s.max() >= 0.7 else None for s in similaridade]
+
+def buscar_intencoes_com_bertimbau(perguntas, modelo_bertimbau, tokenizer_bertimbau, lista_intencoes, batch_size=32):
+    resultados = []
+    for i in range(0, len(perguntas), batch_size):
+        inputs = tokenizer_bertimbau(perguntas[i:i + batch_size], return_tensors="tf", truncation=True, padding=True, max_length=512)
+        probs = tf.nn.softmax(modelo_bertimbau(**inputs).logits, axis=-1).numpy()
+        resultados += [lista_intencoes[p.argmax()] if p.max() > 0.7 else None for p in probs]
+    return resultados
+
+# Classificação em lote (batch_chatbot.py): mesma cascata de prever_intencao, camada a camada por lote.
+# Gera, a cada lote, a lista de (pergunta, intencao, camada).
+def classificar_em_lote(perguntas, batch_size=256, n_process=1, bert_batch_size=32):
+    modelos = inicializar_modelos()
+    perguntas, para_spacy = tee(perguntas)
+    docs = nlp.pipe((p.lower() for p in para_spacy), batch_size=batch_size, n_process=n_process)
+    pares = zip(perguntas, docs)
+    while lote := list(islice(pares, batch_size)):
+        resultados = []
+        for pergunta, doc in lote:
+            intencao = detectar_por_lematizacao(pergunta, modelos['lista_intencoes'], modelos['lemas_por_intencao'], lemas_do_doc(doc))
+            camada = 'lematizacao'
+            if not intencao:
+                intencao = corrigir_palavras(pergunta, modelos['lista_intencoes'])
+                camada = 'correcao'
+            resultados.append([pergunta, intencao, camada if intencao else None])
+
+        pendentes = [r for r in resultados if not r[1]]
+        if pendentes:
+            intencoes = buscar_intencoes_com_embeddings([r[0] for r in pendentes], modelos['modelo_embeddings'], modelos['lista_intencoes'], modelos['intencoes_embeddings'], batch_size)
+            for r, intencao in zip(pendentes, intencoes):
+                r[1], r[2] = intencao, 'embeddings' if intencao else None
+
+        pendentes = [r for r in resultados if not r[1]]
+        if pendentes:
+            intencoes = buscar_intencoes_com_bertimbau([r[0] for r in pendentes], modelos['modelo_bertimbau'], modelos['tokenizer_bertimbau'], modelos['lista_intencoes'], bert_batch_size)
+            for r, intencao in zip(pendentes, intencoes):
+                r[1], r[2] = intencao, 'bertimbau' if intencao else None
+
+        yield [tuple(r) for r in resultados]
+
 # Consulta por intenção
 
+def formatar_progresso(linha):
+    return f"{linha[0]}: {linha[1]} etapas"
+
+def formatar_certificado(linha):
+    return linha[0]
+
+def montar_progresso(itens):
+    return '\n'.join(itens)
+
+def montar_certificado(itens):
+    return "Cursos com certificado: " + ', '.join(itens)
+
+# Intenções respondidas com dados do banco: consulta, formatação de cada linha, montagem da mensagem e resposta sem dados
+CONSULTAS_POR_INTENCAO = {
+    "progresso": (PROGRESSO_QUERY, formatar_progresso, montar_progresso, "Você ainda não começou nenhum curso."),
+    "certificado": (CERTIFICADO_QUERY, formatar_certificado, montar_certificado, "Nenhum certificado disponível."),
+}
+
+RESPOSTAS_FIXAS = {
+    "tempo_conclusao": "Seu tempo de conclusão varia de acordo com seu progresso no curso.",
+    "suporte": "Entre em contato com suporte pelo email docentify@gmail.com",
+    "feedback": "Você pode avaliar os cursos na seção 'Avaliações'.",
+    "instituicao": "Consulte sua instituição no seu painel de cursos.",
+    "duracao": "Os cursos têm durações variadas, conforme o conteúdo.",
+    "meus_cursos": "Seus cursos estão listados no painel de controle.",
+    "obrigatorios": "Consulte a instituição para saber os cursos obrigatórios.",
+    "proximo_modulo": "O próximo módulo pode ser acessado no painel do curso.",
+    "conclusao": "Você pode verificar sua conclusão no seu painel de aluno.",
+    "senha": "Caso tenha esquecido sua senha, redefina-a na página de login.",
+    "alterar_email": "Para alterar seu email, acesse suas configurações de perfil.",
+    "cancelamento": "Para cancelar sua matrícula, entre em contato com a instituição.",
+    "atividades": "Acesse seu painel para ver atividades pendentes e concluídas."
+}
+
+RESPOSTA_PADRAO = "Não encontrei informações relevantes para sua pergunta."
+
 def buscar_dados_no_bd(usuario_id, intencao):
-    if intencao == "tempo_conclusao":
-        return "Seu tempo de conclusão varia de acordo com seu progresso no curso."
-    if intencao == "progresso":
-        query = '''
-        SELECT c.name, COUNT(up.stepId)
-        FROM UserProgress up 
-        JOIN Enrollments e ON up.enrollmentId = e.id
-        JOIN Users u ON e.userId = u.id
-        JOIN Courses c ON e.courseId = c.id
-        WHERE u.email = %s GROUP BY c.name'''
-        r = consultar_bd(query, (usuario_id,))
-        return '\n'.join(f"{x[0]}: {x[1]} etapas" for x in r) if r else "Você ainda não começou nenhum curso."
-    if intencao == "certificado":
-        query = '''
-        SELECT c.name 
-        FROM Courses c 
-        JOIN Enrollments e ON c.id = e.courseId 
-        JOIN Users u ON e.userId = u.id
-        WHERE u.email = %s AND e.isActive = 1'''
-        r = consultar_bd(query, (usuario_id,))
-        return "Cursos com certificado: " + ', '.join(x[0] for x in r) if r else "Nenhum certificado disponível."
-    respostas_fixas = {
-        "suporte": "Entre em contato com suporte pelo email docentify@gmail.com",
-        "feedback": "Você pode avaliar os cursos na seção 'Avaliações'.",
-        "instituicao": "Consulte sua instituição no seu painel de cursos.",
-        "duracao": "Os cursos têm durações variadas, conforme o conteúdo.",
-        "meus_cursos": "Seus cursos estão listados no painel de controle.",
-        "obrigatorios": "Consulte a instituição para saber os cursos obrigatórios.",
-        "proximo_modulo": "O próximo módulo pode ser acessado no painel do curso.",
-        "conclusao": "Você pode verificar sua conclusão no seu painel de aluno.",
-        "senha": "Caso tenha esquecido sua senha, redefina-a na página de login.",
-        "alterar_email": "Para alterar seu email, acesse suas configurações de perfil.",
-        "cancelamento": "Para cancelar sua matrícula, entre em contato com a instituição.",
-        "atividades": "Acesse seu painel para ver atividades pendentes e concluídas."
-    }
-    return respostas_fixas.get(intencao, "Não encontrei informações relevantes para sua pergunta.")
+    if intencao in CONSULTAS_POR_INTENCAO:
+        query, formatar, montar, sem_dados = CONSULTAS_POR_INTENCAO[intencao]
+        itens = [formatar(x) for x in consultar_bd(query, (usuario_id,))]
+        return montar(itens) if itens else sem_dados
+    return RESPOSTAS_FIXAS.get(intencao, RESPOSTA_PADRAO)
 
 # Predição da intenção
 
-def prever_intencao(pergunta, usuario_id, contexto={'tentativas': 0}):
-    modelos = inicializar_modelos()
-    intencao = detectar_por_lematizacao(pergunta, modelos['lista_intencoes'], modelos['lemas_por_intencao'])
-    if not intencao:
-        intencao = corrigir_palavras(pergunta, modelos['lista_intencoes'])
-    if not intencao:
-        intencao = buscar_intencao_com_embeddings(pergunta, modelos['modelo_embeddings'], modelos['lista_intencoes'], modelos['intencoes_embeddings'])
-    if not intencao:
-        intencao = buscar_intencao_com_bertimbau(pergunta, modelos['modelo_bertimbau'], modelos['tokenizer_bertimbau'], modelos['lista_intencoes'])
-    if intencao:
-        return {
-            'message': buscar_dados_no_bd(usuario_id, intencao),
-            'context': contexto
-        }
-    if contexto['tentativas'] < 2:
-        contexto['tentativas'] += 1
-        return {
-            'message': 'Não entendi sua pergunta. Pode repetir, por favor?',
-            'context': contexto
-        }
+def detectar_intencao(pergunta, sessao):
+    chave = normalize_question(pergunta)
+    if chave in sessao['intencoes']:
+        intencao = sessao['intencoes'][chave]
     else:
-        return {
-            'message': 'Infelizmente não consegui entender sua solicitação.\nMas fique tranquilo que o nosso suporte poderá lhe ajudar através do email\n---> docentify@gmail.com <---',
-            'context': {
-                'tentativas': 0
-            }
-        }
+        modelos = inicializar_modelos()
+        intencao = detectar_por_lematizacao(pergunta, modelos['lista_intencoes'], modelos['lemas_por_intencao'])
+        if not intencao:
+            intencao = corrigir_palavras(pergunta, modelos['lista_intencoes'])
+        if not intencao:
+            intencao = buscar_intencao_com_embeddings(pergunta, modelos['modelo_embeddings'], modelos['lista_intencoes'], modelos['intencoes_embeddings'])
+        if not intencao:
+            intencao = buscar_intencao_com_bertimbau(pergunta, modelos['modelo_bertimbau'], modelos['tokenizer_bertimbau'], modelos['lista_intencoes'])
+        sessao['intencoes'][chave] = intencao
+    sessao['historico'].append({'pergunta': pergunta, 'intencao': intencao})
+    return intencao
+
+# Resposta quando nenhuma camada identificou a intenção (conta as tentativas na sessão)
+def resposta_sem_intencao(sessao):
+    if sessao['tentativas'] < 2:
+        sessao['tentativas'] += 1
+        return 'Não entendi sua pergunta. Pode repetir, por favor?'
+    sessao['tentativas'] = 0
+    return 'Infelizmente não consegui entender sua solicitação.\nMas fique tranquilo que o nosso suporte poderá lhe ajudar através do email\n---> docentify@gmail.com <---'
+
+def prever_intencao(pergunta, usuario_id, contexto=None):
+    sessao = get_session(usuario_id, contexto)
+    intencao = detectar_intencao(pergunta, sessao)
+    resposta = buscar_dados_no_bd(usuario_id, intencao) if intencao else resposta_sem_intencao(sessao)
+    save_session(usuario_id, sessao)
+    return {
+        'message': resposta,
+        'context': {'tentativas': sessao['tentativas']}
+    }
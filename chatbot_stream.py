@@ -0,0 +1,119 @@
+# Resposta do chatbot em fluxo (NDJSON ou SSE) para POST /chatbot/stream
+#
+# Eventos, na ordem:
+#   {"evento": "intencao", "intencao": ...}                assim que a cascata termina
+#   {"evento": "detalhe", "item": ...}                     uma por linha do banco (progresso, certificado)
+#   {"evento": "mensagem", "message": ..., "context": ...} mesma resposta de POST /chatbot
+#   {"evento": "erro", "message": ..., "context": ...}     no lugar de "mensagem", se algo falhar no meio
+# Se o cliente desconectar, a tarefa é cancelada, a consulta em andamento recebe KILL QUERY
+# e o cursor e a conexão são fechados assim que a leitura pendente retorna. Se ele desconectar
+# enquanto a conexão é aberta, ela é fechada assim que conectar_bd retornar.
+
+import asyncio
+import threading
+from json import dumps
+
+from chatbot import (
+    CONSULTAS_POR_INTENCAO,
+    RESPOSTA_PADRAO,
+    RESPOSTAS_FIXAS,
+    cancelar_consulta,
+    conectar_bd,
+    consultar_bd_em_fluxo,
+    detectar_intencao,
+    resposta_sem_intencao,
+)
+from session_store import get_session, save_session
+
+
+def formatar_evento(evento, sse=False):
+    dados = dumps(evento, ensure_ascii=False)
+    return f"event: {evento['evento']}\ndata: {dados}\n\n" if sse else dados + "\n"
+
+
+MENSAGEM_ERRO = "Não foi possível buscar seus dados agora. Tente novamente em instantes."
+
+
+def _proxima_linha(linhas, lock):
+    with lock:
+        return next(linhas, None)
+
+
+def _encerrar_consulta(conn, linhas, lock):
+    # KILL QUERY sem esperar o lock: é ele que faz a leitura pendente (se houver) retornar
+    try:
+        cancelar_consulta(conn)
+    except Exception as e:
+        print(f"Falha ao cancelar consulta do chatbot: {e}")
+    _fechar_consulta(conn, linhas, lock)
+
+
+def _fechar_se_conectou(conectando):
+    if not conectando.cancelled() and conectando.exception() is None:
+        conectando.get_loop().run_in_executor(None, conectando.result().close)
+
+
+def _fechar_consulta(conn, linhas, lock):
+    with lock:
+        try:
+            # Fecha o cursor sem buffer; o finally de consultar_bd_em_fluxo fecha a conexão
+            linhas.close()
+        except Exception as e:
+            print(f"Falha ao fechar consulta do chatbot: {e}")
+        # Gerador que nunca começou não roda o finally
+        if conn.open:
+            conn.close()
+
+
+async def eventos_chatbot(pergunta, usuario_id, contexto=None):
+    # Trabalho bloqueante roda no executor; ao cancelar, o await retorna na hora em vez de esperar a thread
+    loop = asyncio.get_running_loop()
+    sessao = get_session(usuario_id, contexto)
+    try:
+        intencao = await loop.run_in_executor(None, detectar_intencao, pergunta, sessao)
+        yield {"evento": "intencao", "intencao": intencao}
+
+        if not intencao:
+            resposta = resposta_sem_intencao(sessao)
+        elif intencao not in CONSULTAS_POR_INTENCAO:
+            resposta = RESPOSTAS_FIXAS.get(intencao, RESPOSTA_PADRAO)
+        else:
+            query, formatar, montar, sem_dados = CONSULTAS_POR_INTENCAO[intencao]
+            conectando = loop.run_in_executor(None, conectar_bd)
+            try:
+                # shield: ao cancelar, o futuro ainda recebe a conexão que a thread abrir
+                conn = await asyncio.shield(conectando)
+            except asyncio.CancelledError:
+                conectando.add_done_callback(_fechar_se_conectou)
+                raise
+            linhas = consultar_bd_em_fluxo(conn, query, (usuario_id,))
+            lock = threading.Lock()
+            itens = []
+            terminou = False
+            try:
+                while (linha := await loop.run_in_executor(None, _proxima_linha, linhas, lock)) is not None:
+                    itens.append(formatar(linha))
+                    yield {"evento": "detalhe", "item": itens[-1]}
+                terminou = True
+            except Exception:
+                terminou = True
+                await loop.run_in_executor(None, _fechar_consulta, conn, linhas, lock)
+                raise
+            finally:
+                if not terminou:
+                    # Cancelamento (cliente desconectou): sem await, o encerramento segue em segundo plano
+                    loop.run_in_executor(None, _encerrar_consulta, conn, linhas, lock)
+            resposta = montar(itens) if itens else sem_dados
+    except Exception as e:
+        print(f"Falha na resposta em fluxo do chatbot: {e}")
+        save_session(usuario_id, sessao)
+        yield {"evento": "erro", "message": MENSAGEM_ERRO, "context": {"tentativas": sessao["tentativas"]}}
+        return
+
+    save_session(usuario_id, sessao)
+    yield {"evento": "mensagem", "message": resposta, "context": {"tentativas": sessao["tentativas"]}}
+
+
+async def fluxo_chatbot(pergunta, usuario_id, contexto=None, sse=False):
+    async for evento in eventos_chatbot(pergunta, usuario_id, contexto):
+        yield formatar_evento(evento, sse)
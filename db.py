@@ -0,0 +1,5 @@
+import pymysql
+
+
+def connect_to_db(host, port, user, password, db_name):
+    return pymysql.connect(host=host, port=int(port), user=user, password=password, database=db_name, ssl={"teste": True})
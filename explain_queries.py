@@ -0,0 +1,83 @@
+# Verificação dos planos de execução das consultas registradas em sql_queries.py
+#
+# Roda EXPLAIN em cada consulta de gráfico e do chatbot e falha (exit 1) se
+# alguma delas ler uma tabela inteira: full table scan (type = ALL) ou full
+# index scan (type = index). Deve ser executado contra um banco com volume de
+# benchmark, após `python schema.py`. O id e o email precisam existir no banco:
+# com valores inexistentes o MySQL resolve o plano como "Impossible WHERE" e
+# nada é verificado, o que também conta como falha.
+# Uso: python explain_queries.py --institution-id 3 --email usuario@exemplo.com
+
+import argparse
+import sys
+from os import environ
+
+import pymysql
+
+from db import connect_to_db
+from sql_queries import CHATBOT_QUERIES, GRAPH_QUERIES
+
+
+def explain(conn, query, params):
+    with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute("EXPLAIN " + query.strip().rstrip(";"), params)
+        return cursor.fetchall()
+
+
+def full_scans(plan):
+    # ALL = full table scan; index = full index scan, que também lê todas as linhas.
+    # CTEs e subconsultas materializadas (<derivedN>, <subqueryN>) são lidas por inteiro por
+    # definição; as tabelas de origem delas aparecem em linhas próprias do plano e são verificadas ali.
+    return [
+        f"{row['table']} ({row['type']})"
+        for row in plan
+        if row.get("type") in ("ALL", "index") and not str(row.get("table")).startswith(("<derived", "<subquery"))
+    ]
+
+
+def unverified_plan(plan):
+    # Plano colapsado (constante inexistente, WHERE impossível): nenhuma tabela foi de fato planejada
+    for row in plan:
+        extra = row.get("Extra") or ""
+        if row.get("table") is None or "Impossible WHERE" in extra or "no matching row" in extra:
+            return extra or "tabela ausente no plano"
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Falha se alguma consulta registrada fizer full table scan ou full index scan.")
+    parser.add_argument("--institution-id", required=True, help="instituição existente no banco de benchmark")
+    parser.add_argument("--email", required=True, help="email de um usuário existente no banco de benchmark")
+    args = parser.parse_args(argv)
+
+    conn = connect_to_db(
+        environ["DB_HOST"], environ["DB_PORT"], environ["DB_USER"], environ["DB_PASSWORD"], environ["DB_NAME"]
+    )
+    consultas = [(f"graph:{nome}", q, (args.institution_id,)) for nome, q in GRAPH_QUERIES.items()]
+    consultas += [(f"chatbot:{nome}", q, (args.email,)) for nome, q in CHATBOT_QUERIES.items()]
+
+    falhas = 0
+    for nome, query, params in consultas:
+        try:
+            plano = explain(conn, query, params)
+        except Exception as e:
+            print(f"ERRO  {nome}: {e}")
+            falhas += 1
+            continue
+        motivo = unverified_plan(plano)
+        tabelas = full_scans(plano)
+        if motivo:
+            print(f"NAOV  {nome}: plano não verificado ({motivo})")
+            falhas += 1
+        elif tabelas:
+            print(f"SCAN  {nome}: leitura completa em {', '.join(tabelas)}")
+            falhas += 1
+        else:
+            print(f"OK    {nome}")
+
+    print(f"{len(consultas) - falhas}/{len(consultas)} consultas sem leitura completa de tabela")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,15 +2,25 @@ import base64
 from io import BytesIO
 import matplotlib.pyplot as plt
 import pandas as pd
-import pymysql
 import seaborn as sns
 import numpy as np
 from os import environ
-
-
-def connect_to_db(host, port, user, password, db_name):
-    conn = pymysql.connect(host=host, port=port, user=user, password=password, database=db_name, ssl={"teste": True})
-    return conn
+from db import connect_to_db
+from sql_queries import (
+    COURSE_STUDENTS_QUERY,
+    ACCUMULATED_PROGRESS_QUERY,
+    COURSE_POPULARITY_QUERY,
+    INDIVIDUAL_PROGRESS_QUERY,
+    AVERAGE_PERFORMANCE_BY_COURSE_QUERY,
+    PERFORMANCE_BENCHMARK_REPORT_QUERY,
+    USER_GENDER_DISTRIBUTION_QUERY,
+    USER_ACTIVITY_OVER_WEEK_QUERY,
+    COURSE_COMPLETION_REPORT_QUERY,
+    FAVORITED_COURSES_QUERY,
+    INCOMPLETE_STEPS_ANALYSIS_QUERY,
+    ACTIVITY_PERFORMANCE_QUERY,
+    COMPLETED_STEPS_WITHIN_TIME_RATE_QUERY,
+)
 
 
 sns.set(style="whitegrid")
@@ -24,19 +34,7 @@ def course_students(institution_id):
         password=environ.get("DB_PASSWORD"),
         db_name=environ.get("DB_NAME"),
     )
-    query_courses = """
-    SELECT 
-        c.name AS Curso, 
-        i.name AS Instituicao,
-        COALESCE(COUNT(e.userId), 0) AS Total_Inscritos
-    FROM Courses c
-    LEFT JOIN Institutions i ON c.institutionId = i.id
-    LEFT JOIN Enrollments e ON c.id = e.courseId
-    WHERE i.id = %s
-    GROUP BY c.id, c.name, i.name
-    ORDER BY Total_Inscritos DESC;
-    """
-    df_courses = pd.read_sql(query_courses, conn, params=[institution_id])
+    df_courses = pd.read_sql(COURSE_STUDENTS_QUERY, conn, params=[institution_id])
 
     df_courses["Total_Inscritos"] = df_courses["Total_Inscritos"].astype(int)
 
@@ -69,28 +67,8 @@ def accumulated_progress(institution_id):
         password=environ.get("DB_PASSWORD"),
         db_name=environ.get("DB_NAME"),
     )
-    query_progress = """
-    SELECT 
-        U.id AS Usuario_ID,
-        U.name AS Nome,
-        C.id AS Curso_ID,
-        C.name AS Curso,
-        E.enrollmentDate AS Data_Inscricao,
-        UP.progressDate AS Data_Progresso,
-        I.id AS Instituicao_ID,
-        I.name AS Instituicao
-    FROM Users U
-    JOIN Enrollments E ON U.id = E.userId
-    JOIN Courses C ON E.courseId = C.id
-    JOIN Institutions I ON C.institutionId = I.id
-    LEFT JOIN UserProgress UP ON E.id = UP.enrollmentId
-    WHERE I.id = %s  -- 🚀 Substituir pelo ID da instituição desejada
-    ORDER BY UP.progressDate;
-    """
-
-    df_progress = pd.read_sql(query_progress, conn, params=[institution_id])
-
-    df_progress = df_progress[df_progress["Instituicao_ID"] == 3]
+
+    df_progress = pd.read_sql(ACCUMULATED_PROGRESS_QUERY, conn, params=[institution_id])
 
     df_progress["Data_Progresso"] = pd.to_datetime(df_progress["Data_Progresso"], errors="coerce").dt.strftime(
         "%d/%m/%Y"
@@ -124,19 +102,8 @@ def course_popularity(institution_id):
         password=environ.get("DB_PASSWORD"),
         db_name=environ.get("DB_NAME"),
     )
-    query_popularity = """
-    SELECT 
-        c.name AS Curso, 
-        COUNT(DISTINCT e.userId) AS Total_Finalizados
-    FROM Courses c
-    LEFT JOIN Enrollments e ON c.id = e.courseId
-    LEFT JOIN UserProgress up ON e.id = up.enrollmentId
-    JOIN Institutions i ON c.institutionId = i.id
-    WHERE i.id = %s
-    GROUP BY c.id, c.name;
-    """
-
-    df_popularity = pd.read_sql(query_popularity, conn, params=[institution_id])
+
+    df_popularity = pd.read_sql(COURSE_POPULARITY_QUERY, conn, params=[institution_id])
 
     df_popularity["Total_Finalizados"] = df_popularity["Total_Finalizados"].fillna(0).astype(int)
 
@@ -166,21 +133,8 @@ def individual_progress(institution_id):
         password=environ.get("DB_PASSWORD"),
         db_name=environ.get("DB_NAME"),
     )
-    query_individual_progress = """
-    SELECT 
-        u.name AS Nome, 
-        c.name AS Curso, 
-        COUNT(up.stepId) AS Progresso
-    FROM Enrollments e
-    JOIN Users u ON e.userId = u.id
-    JOIN Courses c ON e.courseId = c.id
-    LEFT JOIN UserProgress up ON e.id = up.enrollmentId
-    WHERE c.institutionId = %s
-    GROUP BY u.id, u.name, c.id, c.name
-    ORDER BY u.name, c.name
-    """
-
-    df_individual_progress = pd.read_sql(query_individual_progress, conn, params=[institution_id])
+
+    df_individual_progress = pd.read_sql(INDIVIDUAL_PROGRESS_QUERY, conn, params=[institution_id])
 
     df_individual_progress["Progresso"] = df_individual_progress["Progresso"].astype(int)
 
@@ -205,19 +159,8 @@ def average_performance_by_course(institution_id):
         password=environ.get("DB_PASSWORD"),
         db_name=environ.get("DB_NAME"),
     )
-    query_benchmarking = """
-    SELECT 
-        c.name AS Curso,
-        (COUNT(up.stepId) / (SELECT COUNT(s.id) FROM Steps s WHERE s.courseId = c.id)) * 100 AS Media_Progresso
-    FROM Courses c
-    LEFT JOIN Enrollments e ON c.id = e.courseId
-    LEFT JOIN UserProgress up ON e.id = up.enrollmentId
-    WHERE c.institutionId = %s
-    GROUP BY c.id, c.name
-    ORDER BY Media_Progresso DESC;
-    """
-
-    df_benchmarking = pd.read_sql(query_benchmarking, conn, params=[institution_id])
+
+    df_benchmarking = pd.read_sql(AVERAGE_PERFORMANCE_BY_COURSE_QUERY, conn, params=[institution_id])
 
     plt.figure(figsize=(10, 6))
     sns.barplot(x="Media_Progresso", y="Curso", data=df_benchmarking, palette="viridis")
@@ -239,20 +182,7 @@ def performance_benchmark_report(institution_id):
         password=environ.get("DB_PASSWORD"),
         db_name=environ.get("DB_NAME"),
     )
-    query = """
-        SELECT 
-            U.name AS Usuario, 
-            COUNT(UP.stepId) AS Etapas_Completadas
-        FROM Users U
-        JOIN Enrollments E ON U.id = E.userId
-        LEFT JOIN UserProgress UP ON E.id = UP.enrollmentId
-        WHERE E.isActive = 1  -- Apenas inscrições ativas
-        AND E.courseId IN (
-            SELECT id FROM Courses WHERE institutionId = 3  -- Filtra por instituição
-        )
-        GROUP BY U.id, U.name
-    """
-    df_benchmark = pd.read_sql(query, conn, params=[institution_id])
+    df_benchmark = pd.read_sql(PERFORMANCE_BENCHMARK_REPORT_QUERY, conn, params=[institution_id])
 
     plt.figure(figsize=(10, 6))
     sns.barplot(x="Usuario", y="Etapas_Completadas", data=df_benchmark, palette="viridis")
@@ -278,15 +208,7 @@ def user_gender_distribution(institution_id):
         password=environ.get("DB_PASSWORD"),
         db_name=environ.get("DB_NAME"),
     )
-    query_gender = """
-    SELECT U.gender, COUNT(*) AS Total_Usuarios
-    FROM Users U
-    JOIN Enrollments E ON U.id = E.userId
-    JOIN Courses C ON E.courseId = C.id
-    WHERE C.institutionId = %s  -- Filtra apenas os usuários da instituição específica
-    GROUP BY U.gender
-    """
-    df_gender = pd.read_sql(query_gender, conn, params=[institution_id])
+    df_gender = pd.read_sql(USER_GENDER_DISTRIBUTION_QUERY, conn, params=[institution_id])
 
     plt.figure(figsize=(8, 6))
     sns.barplot(x="gender", y="Total_Usuarios", data=df_gender, palette="coolwarm")
@@ -307,28 +229,7 @@ def user_activity_over_week(institution_id):
         password=environ.get("DB_PASSWORD"),
         db_name=environ.get("DB_NAME"),
     )
-    query_weekday_activity_per_user = """
-    SELECT 
-        U.name AS Usuario,
-        CASE 
-            WHEN DAYOFWEEK(UP.progressDate) = 1 THEN 'Domingo'
-            WHEN DAYOFWEEK(UP.progressDate) = 2 THEN 'Segunda-feira'
-            WHEN DAYOFWEEK(UP.progressDate) = 3 THEN 'Terça-feira'
-            WHEN DAYOFWEEK(UP.progressDate) = 4 THEN 'Quarta-feira'
-            WHEN DAYOFWEEK(UP.progressDate) = 5 THEN 'Quinta-feira'
-            WHEN DAYOFWEEK(UP.progressDate) = 6 THEN 'Sexta-feira'
-            WHEN DAYOFWEEK(UP.progressDate) = 7 THEN 'Sábado'
-        END AS Dia_Semana,
-        COUNT(*) AS Total_Atividades
-    FROM UserProgress UP
-    JOIN Enrollments E ON UP.enrollmentId = E.id
-    JOIN Users U ON E.userId = U.id
-    JOIN Courses C ON E.courseId = C.id
-    WHERE C.institutionId = %s
-    GROUP BY Usuario, Dia_Semana
-    ORDER BY Usuario, FIELD(Dia_Semana, 'Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira', 'Sábado', 'Domingo')
-    """
-    df_weekday_user = pd.read_sql(query_weekday_activity_per_user, conn, params=[institution_id])
+    df_weekday_user = pd.read_sql(USER_ACTIVITY_OVER_WEEK_QUERY, conn, params=[institution_id])
 
     plt.figure(figsize=(12, 6))
     sns.lineplot(x="Dia_Semana", y="Total_Atividades", hue="Usuario", data=df_weekday_user, marker="o")
@@ -354,17 +255,7 @@ def course_completion_report(institution_id):
         password=environ.get("DB_PASSWORD"),
         db_name=environ.get("DB_NAME"),
     )
-    query_course_completion = """
-    SELECT i.name AS Instituicao, c.name AS Curso, COUNT(e.id) AS Total_Inscritos, 
-        COUNT(DISTINCT up.enrollmentId) AS Total_Concluidos
-    FROM Enrollments e
-    JOIN Courses c ON e.courseId = c.id
-    JOIN Institutions i ON c.institutionId = i.id
-    LEFT JOIN UserProgress up ON e.id = up.enrollmentId
-    WHERE i.id = %s
-    GROUP BY i.name, c.name
-    """
-    df_completion = pd.read_sql(query_course_completion, conn, params=[institution_id])
+    df_completion = pd.read_sql(COURSE_COMPLETION_REPORT_QUERY, conn, params=[institution_id])
     df_completion["Taxa_Conclusao"] = (df_completion["Total_Concluidos"] / df_completion["Total_Inscritos"]) * 100
 
     plt.figure(figsize=(12, 8))
@@ -390,15 +281,7 @@ def favorited_courses(institution_id):
         password=environ.get("DB_PASSWORD"),
         db_name=environ.get("DB_NAME"),
     )
-    query_favorites = """
-    SELECT c.name AS Curso, COUNT(fc.userId) AS Total_Favoritos
-    FROM FavoritedCourses fc
-    JOIN Courses c ON fc.courseId = c.id
-    WHERE c.institutionId = %s
-    GROUP BY c.id, c.name
-    ORDER BY Total_Favoritos ASC 
-    """
-    df_favorites = pd.read_sql(query_favorites, conn, params=[institution_id])
+    df_favorites = pd.read_sql(FAVORITED_COURSES_QUERY, conn, params=[institution_id])
 
     df_favorites = df_favorites.sort_values(by="Total_Favoritos", ascending=True)
 
@@ -423,17 +306,7 @@ def incomplete_steps_analysis(institution_id):
         password=environ.get("DB_PASSWORD"),
         db_name=environ.get("DB_NAME"),
     )
-    query_incomplete_steps = """
-    SELECT s.title AS Etapa, c.name AS Curso, 
-        (COUNT(e.id) - COUNT(DISTINCT up.enrollmentId)) AS Total_Nao_Completas
-    FROM Steps s
-    JOIN Courses c ON s.courseId = c.id
-    LEFT JOIN UserProgress up ON s.id = up.stepId
-    LEFT JOIN Enrollments e ON e.courseId = s.courseId
-    WHERE c.institutionId = %s
-    GROUP BY s.id, s.title, c.id, c.name
-    """
-    df_incomplete_steps = pd.read_sql(query_incomplete_steps, conn, params=[institution_id])
+    df_incomplete_steps = pd.read_sql(INCOMPLETE_STEPS_ANALYSIS_QUERY, conn, params=[institution_id])
 
     plt.figure(figsize=(12, 8))
     sns.barplot(x="Total_Nao_Completas", y="Etapa", hue="Curso", data=df_incomplete_steps, palette="magma")
@@ -457,20 +330,8 @@ def activity_performance(institution_id):
         password=environ.get("DB_PASSWORD"),
         db_name=environ.get("DB_NAME"),
     )
-    query_activity_performance = """
-    SELECT c.name AS Curso, 
-        a.allowedAttempts AS Tentativas_Permitidas, 
-        AVG(at.score) AS Media_Pontuacao, 
-        COUNT(at.id) AS Total_Tentativas
-    FROM Activities a
-    JOIN Steps s ON a.stepId = s.id
-    JOIN Courses c ON s.courseId = c.id
-    LEFT JOIN ActivityAttempts at ON a.id = at.activityId
-    WHERE c.institutionId = %s
-    GROUP BY c.id, c.name, a.allowedAttempts
-    """
-
-    df_activity_perf = pd.read_sql(query_activity_performance, conn, params=[institution_id])
+
+    df_activity_perf = pd.read_sql(ACTIVITY_PERFORMANCE_QUERY, conn, params=[institution_id])
 
     plt.figure(figsize=(10, 6))
     sns.barplot(x="Media_Pontuacao", y="Curso", hue="Tentativas_Permitidas", data=df_activity_perf, palette="coolwarm")
@@ -495,19 +356,8 @@ def completed_steps_within_time_rate(institution_id):
         password=environ.get("DB_PASSWORD"),
         db_name=environ.get("DB_NAME"),
     )
-    query_on_time = """
-    SELECT c.name AS Curso, 
-        COUNT(CASE WHEN up.progressDate <= DATE_ADD(e.enrollmentDate, INTERVAL IFNULL(c.requiredTimeLimit, 0) DAY) THEN 1 END) AS Dentro_Prazo,
-        COUNT(up.stepId) AS Total_Atividades
-    FROM Courses c
-    LEFT JOIN Enrollments e ON e.courseId = c.id
-    LEFT JOIN UserProgress up ON e.id = up.enrollmentId
-    WHERE c.institutionId = %s
-    GROUP BY c.id, c.name
-    ORDER BY Dentro_Prazo DESC
-    """
-
-    df_on_time = pd.read_sql(query_on_time, conn, params=[institution_id])
+
+    df_on_time = pd.read_sql(COMPLETED_STEPS_WITHIN_TIME_RATE_QUERY, conn, params=[institution_id])
 
     df_on_time["Taxa_Dentro_Prazo"] = (
         df_on_time["Dentro_Prazo"] / df_on_time["Total_Atividades"].replace(0, np.nan)
@@ -527,3 +377,21 @@ def completed_steps_within_time_rate(institution_id):
     plt.savefig(bio, format="png")
     bio.seek(0)
     return base64.b64encode(bio.read())
+
+
+# Nome do gráfico na rota /graph/{graph}/{institution_id} -> função que o gera
+GRAPHS = {
+    "course_students": course_students,
+    "accumulated_students": accumulated_progress,
+    "course_popularity": course_popularity,
+    "individual_progress": individual_progress,
+    "average_performance_by_course": average_performance_by_course,
+    "performance_benchmark_report": performance_benchmark_report,
+    "user_gender_distribution": user_gender_distribution,
+    "user_activity_over_week": user_activity_over_week,
+    "course_completion_report": course_completion_report,
+    "favorited_courses": favorited_courses,
+    "incomplete_steps_analysis": incomplete_steps_analysis,
+    "activity_performance": activity_performance,
+    "completed_steps_within_time_rate": completed_steps_within_time_rate,
+}
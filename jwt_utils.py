@@ -1,7 +1,23 @@
-
+import hashlib
+import hmac
+import threading
+import time
 from base64 import urlsafe_b64decode
-from fastapi import Request
+from binascii import Error as Base64Error
+from collections import OrderedDict
+from functools import lru_cache
 from json import loads
+from os import environ
+
+from fastapi import HTTPException, Request
+
+JWT_CACHE_SIZE = int(environ.get("JWT_CACHE_SIZE", "4096"))
+MAX_TOKEN_LENGTH = 8192
+
+# token -> claims já decodificadas e verificadas (LRU). get_jwt_data é uma dependência
+# síncrona, executada no threadpool do FastAPI, então todo acesso ao cache passa pelo lock.
+_claims_cache = OrderedDict()
+_claims_lock = threading.Lock()
 
 
 def base64url_decode(data):
@@ -9,6 +25,75 @@ def base64url_decode(data):
     return urlsafe_b64decode(padded)
 
 
+@lru_cache(maxsize=1)
+def _signing_key():
+    # Chave HS256 lida uma única vez; sem JWT_SECRET o token é aceito sem verificação (gateway confiável)
+    secret = environ.get("JWT_SECRET")
+    return secret.encode() if secret else None
+
+
+def _unauthorized(detail):
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+def _decode_token(token):
+    partes = token.split(".")
+    chave = _signing_key()
+    if len(partes) == 3:
+        header_b64, payload_b64, assinatura_b64 = partes
+        if chave is not None:
+            header = loads(base64url_decode(header_b64))
+            if header.get("alg") != "HS256":
+                raise _unauthorized("Algoritmo de assinatura não suportado")
+            esperado = hmac.new(chave, f"{header_b64}.{payload_b64}".encode(), hashlib.sha256).digest()
+            if not hmac.compare_digest(esperado, base64url_decode(assinatura_b64)):
+                raise _unauthorized("Assinatura inválida")
+        claims = loads(base64url_decode(payload_b64))
+    elif len(partes) == 1 and chave is None:
+        # Formato legado: só o payload em base64
+        claims = loads(base64url_decode(token))
+    else:
+        raise _unauthorized("Token malformado")
+    if not isinstance(claims, dict):
+        raise _unauthorized("Token malformado")
+    return claims
+
+
+def decode_token(token):
+    agora = time.time()
+    with _claims_lock:
+        claims = _claims_cache.get(token)
+        expirado = claims is not None and claims.get("exp") is not None and claims["exp"] <= agora
+        if expirado:
+            _claims_cache.pop(token, None)
+        elif claims is not None:
+            _claims_cache.move_to_end(token)
+    if expirado:
+        raise _unauthorized("Token expirado")
+    if claims is not None:
+        return claims
+
+    try:
+        claims = _decode_token(token)
+        expirado = claims.get("exp") is not None and claims["exp"] <= agora
+    except (ValueError, TypeError, AttributeError, Base64Error):
+        raise _unauthorized("Token malformado")
+    if expirado:
+        raise _unauthorized("Token expirado")
+
+    with _claims_lock:
+        _claims_cache[token] = claims
+        if len(_claims_cache) > JWT_CACHE_SIZE:
+            _claims_cache.popitem(last=False)
+    return claims
+
+
 def get_jwt_data(request: Request):
-    jwt = request.headers.get("Authorization").replace("Bearer ", "")
-    return loads(base64url_decode(jwt))
\ No newline at end of file
+    # Usado como dependência do FastAPI: rejeita cabeçalhos inválidos antes de qualquer modelo ou consulta
+    authorization = request.headers.get("Authorization")
+    if not authorization or not authorization.startswith("Bearer "):
+        raise _unauthorized("Cabeçalho Authorization ausente ou inválido")
+    token = authorization[len("Bearer "):].strip()
+    if not token or len(token) > MAX_TOKEN_LENGTH:
+        raise _unauthorized("Token malformado")
+    return decode_token(token)
@@ -1,23 +1,12 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import PlainTextResponse
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from huggingface_hub import snapshot_download
 from jwt_utils import get_jwt_data
 from chatbot import prever_intencao
-from graphs import (
-    accumulated_progress,
-    activity_performance,
-    average_performance_by_course,
-    completed_steps_within_time_rate,
-    course_completion_report,
-    course_popularity,
-    course_students,
-    favorited_courses,
-    incomplete_steps_analysis,
-    individual_progress,
-    performance_benchmark_report,
-    user_activity_over_week,
-    user_gender_distribution,
-)
+from batch_chatbot import MAX_BATCH_LINES, classificar_jsonl, linhas_do_arquivo, receber_corpo
+from chatbot_stream import fluxo_chatbot
+from graphs import GRAPHS
+from chart_store import get_chart, record_request, save_chart
 from queries import ChatbotQuery
 
 
@@ -26,40 +15,54 @@ app = FastAPI()
 
 @app.get("/graph/{graph}/{institution_id}")
 async def get_graph(request: Request, graph: str, institution_id: str):
-    if graph == "course_students":
-        data = course_students(institution_id)
-    elif graph == "accumulated_students":
-        data = accumulated_progress(institution_id)
-    elif graph == "course_popularity":
-        data = course_popularity(institution_id)
-    elif graph == "individual_progress":
-        data = individual_progress(institution_id)
-    elif graph == "average_performance_by_course":
-        data = average_performance_by_course(institution_id)
-    elif graph == "performance_benchmark_report":
-        data = performance_benchmark_report(institution_id)
-    elif graph == "user_gender_distribution":
-        data = user_gender_distribution(institution_id)
-    elif graph == "user_activity_over_week":
-        data = user_activity_over_week(institution_id)
-    elif graph == "course_completion_report":
-        data = course_completion_report(institution_id)
-    elif graph == "favorited_courses":
-        data = favorited_courses(institution_id)
-    elif graph == "incomplete_steps_analysis":
-        data = incomplete_steps_analysis(institution_id)
-    elif graph == "activity_performance":
-        data = activity_performance(institution_id)
-    elif graph == "completed_steps_within_time_rate":
-        data = completed_steps_within_time_rate(institution_id)
-    else:
+    if graph not in GRAPHS:
         return {"error": "Graph not found"}
 
+    if not (institution_id.isascii() and institution_id.isdigit()):
+        return {"error": "Institution not found"}
+    # "03" e "3" são a mesma instituição e a mesma entrada no chart_store
+    institution_id = str(int(institution_id))
+
+    record_request(institution_id)
+    data = get_chart(graph, institution_id)
+    if data is None:
+        data = GRAPHS[graph](institution_id)
+        save_chart(graph, institution_id, data)
+
     return PlainTextResponse(data)
 
 
 @app.post("/chatbot")
-async def get_chatbot_response(request: Request, query: ChatbotQuery):
-    data = get_jwt_data(request)
+async def get_chatbot_response(request: Request, query: ChatbotQuery, data: dict = Depends(get_jwt_data)):
     user_email = data.get("email")
     return prever_intencao(query.user_message, user_email, query.context)
+
+
+@app.post("/chatbot/stream")
+async def get_chatbot_stream_response(request: Request, query: ChatbotQuery, data: dict = Depends(get_jwt_data)):
+    # SSE quando o cliente pede text/event-stream, NDJSON caso contrário
+    sse = "text/event-stream" in request.headers.get("Accept", "")
+    return StreamingResponse(
+        fluxo_chatbot(query.user_message, data.get("email"), query.context, sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        # Sem isso, proxies (nginx) seguram os eventos e a intenção não chega antes da resposta
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"} if sse else None,
+    )
+
+
+@app.post("/chatbot/batch")
+async def get_chatbot_batch_response(
+    request: Request,
+    batch_size: int = Query(256, ge=1, le=2048),
+    bert_batch_size: int = Query(32, ge=1, le=256),
+    data: dict = Depends(get_jwt_data),
+):
+    # Corpo em JSONL, uma pergunta por linha, recebido por completo antes da resposta;
+    # resultados devolvidos em NDJSON à medida que cada lote termina
+    corpo = await receber_corpo(request.stream())
+    if corpo is None:
+        raise HTTPException(status_code=413, detail="Corpo da requisição grande demais")
+    return StreamingResponse(
+        classificar_jsonl(linhas_do_arquivo(corpo), batch_size, 1, bert_batch_size, MAX_BATCH_LINES),
+        media_type="application/x-ndjson",
+    )
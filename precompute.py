@@ -0,0 +1,76 @@
+# Worker de pré-cálculo dos gráficos das instituições ativas
+#
+# Roda separado da API (python precompute.py) e, a cada PRECOMPUTE_INTERVAL
+# segundos, gera no chart_store os gráficos das instituições que receberam
+# requisições na última PRECOMPUTE_WINDOW, das mais acessadas para as menos.
+# Os gráficos rodam em no máximo PRECOMPUTE_CONCURRENCY processos com prioridade
+# reduzida (nice), para não competir com o tráfego ao vivo.
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from os import environ
+
+import matplotlib.pyplot as plt
+
+from chart_store import CHART_TTL, chart_age, request_counts, save_chart
+from graphs import GRAPHS
+
+PRECOMPUTE_INTERVAL = int(environ.get("PRECOMPUTE_INTERVAL", "300"))
+PRECOMPUTE_WINDOW = int(environ.get("PRECOMPUTE_WINDOW", "86400"))
+PRECOMPUTE_CONCURRENCY = int(environ.get("PRECOMPUTE_CONCURRENCY", "1"))
+PRECOMPUTE_MAX_INSTITUTIONS = int(environ.get("PRECOMPUTE_MAX_INSTITUTIONS", "20"))
+PRECOMPUTE_NICE = int(environ.get("PRECOMPUTE_NICE", "10"))
+
+
+def _init_worker():
+    os.nice(PRECOMPUTE_NICE)
+
+
+def _render(graph, institution_id):
+    # Cada gráfico roda em um processo: o pyplot não é thread-safe e guarda as figuras abertas
+    try:
+        save_chart(graph, institution_id, GRAPHS[graph](institution_id))
+    finally:
+        plt.close("all")
+
+
+def pending_charts(counts, graphs, max_age):
+    # Gráficos vencidos (ou perto de vencer) das instituições mais acessadas primeiro
+    ativas = sorted(counts, key=counts.get, reverse=True)[:PRECOMPUTE_MAX_INSTITUTIONS]
+    pendentes = []
+    for institution_id in ativas:
+        for graph in graphs:
+            idade = chart_age(graph, institution_id)
+            if idade is None or idade >= max_age:
+                pendentes.append((graph, institution_id))
+    return pendentes
+
+
+def run_once(executor, graphs):
+    counts = request_counts(PRECOMPUTE_WINDOW)
+    # Renova com folga de um intervalo para o gráfico nunca expirar entre dois ciclos
+    pendentes = pending_charts(counts, graphs, max(CHART_TTL - PRECOMPUTE_INTERVAL, 0))
+    futures = {executor.submit(_render, graph, institution_id): (graph, institution_id) for graph, institution_id in pendentes}
+    for future in as_completed(futures):
+        graph, institution_id = futures[future]
+        try:
+            future.result()
+            print(f"Pré-calculado {graph} para instituição {institution_id}")
+        except Exception as e:
+            print(f"Falha ao pré-calcular {graph} para instituição {institution_id}: {e}")
+    return len(pendentes)
+
+
+def main():
+    graphs = list(GRAPHS)
+    with ProcessPoolExecutor(max_workers=PRECOMPUTE_CONCURRENCY, initializer=_init_worker) as executor:
+        while True:
+            inicio = time.monotonic()
+            total = run_once(executor, graphs)
+            print(f"Ciclo de pré-cálculo: {total} gráfico(s) em {time.monotonic() - inicio:.1f}s")
+            time.sleep(max(PRECOMPUTE_INTERVAL - (time.monotonic() - inicio), 0))
+
+
+if __name__ == "__main__":
+    main()
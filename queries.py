@@ -3,4 +3,4 @@ from pydantic import BaseModel
 
 class ChatbotQuery(BaseModel):
     user_message: str
-    context: dict | None = {"tentativas": 0}
+    context: dict | None = None
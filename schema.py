@@ -0,0 +1,64 @@
+# Índices necessários pelas consultas de sql_queries.py
+#
+# Cada índice cobre exatamente as colunas filtradas, juntadas e lidas por um
+# grupo de consultas, para que o MySQL resolva o acesso sem voltar à tabela.
+# Rodar com: python schema.py
+
+from os import environ
+
+from db import connect_to_db
+
+
+INDEXES = [
+    # WHERE c.institutionId = %s -> Courses por instituição (todos os gráficos)
+    ("Courses", "idx_courses_institution", ["institutionId", "id", "name"]),
+    # JOIN Enrollments e ON e.courseId = c.id, lendo userId/isActive/enrollmentDate
+    ("Enrollments", "idx_enrollments_course", ["courseId", "isActive", "userId", "id", "enrollmentDate"]),
+    # JOIN Enrollments e ON e.userId = u.id (chatbot, a partir do email)
+    ("Enrollments", "idx_enrollments_user", ["userId", "isActive", "courseId", "id"]),
+    # JOIN UserProgress up ON up.enrollmentId = e.id, lendo stepId/progressDate
+    ("UserProgress", "idx_userprogress_enrollment", ["enrollmentId", "stepId", "progressDate"]),
+    # JOIN UserProgress up ON up.stepId = s.id (incomplete_steps_analysis)
+    ("UserProgress", "idx_userprogress_step", ["stepId", "enrollmentId"]),
+    # JOIN Steps s ON s.courseId = c.id
+    ("Steps", "idx_steps_course", ["courseId", "id", "title"]),
+    # WHERE u.email = %s (chatbot)
+    ("Users", "idx_users_email", ["email", "id"]),
+    # JOIN FavoritedCourses fc ON fc.courseId = c.id
+    ("FavoritedCourses", "idx_favoritedcourses_course", ["courseId", "userId"]),
+    # JOIN Activities a ON a.stepId = s.id
+    ("Activities", "idx_activities_step", ["stepId", "id", "allowedAttempts"]),
+    # JOIN ActivityAttempts at ON at.activityId = a.id, lendo score
+    ("ActivityAttempts", "idx_activityattempts_activity", ["activityId", "score", "id"]),
+]
+
+
+def existing_indexes(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT DISTINCT TABLE_NAME, INDEX_NAME FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE()"
+        )
+        return {(table, index) for table, index in cursor.fetchall()}
+
+
+def apply_indexes(conn):
+    # O MySQL não suporta CREATE INDEX IF NOT EXISTS, então a migração consulta o catálogo antes
+    existentes = existing_indexes(conn)
+    criados = []
+    with conn.cursor() as cursor:
+        for table, index, columns in INDEXES:
+            if (table, index) in existentes:
+                continue
+            cols = ", ".join(f"`{c}`" for c in columns)
+            cursor.execute(f"CREATE INDEX `{index}` ON `{table}` ({cols})")
+            criados.append(index)
+    conn.commit()
+    return criados
+
+
+if __name__ == "__main__":
+    conn = connect_to_db(
+        environ["DB_HOST"], environ["DB_PORT"], environ["DB_USER"], environ["DB_PASSWORD"], environ["DB_NAME"]
+    )
+    criados = apply_indexes(conn)
+    print(f"{len(criados)} índice(s) criado(s): {', '.join(criados) if criados else '-'}")
@@ -0,0 +1,129 @@
+# Sessões do chatbot guardadas no servidor, indexadas pelo email do JWT
+#
+# Cada sessão guarda o número de tentativas sem entender a pergunta, o
+# histórico recente da conversa e a intenção já detectada por pergunta, para
+# que uma pergunta repetida não passe de novo pela cascata. A sessão só tem
+# tipos JSON. O backend é escolhido por SESSION_BACKEND:
+#   memory  LRU em memória, por worker (padrão; só para um worker)
+#   file    diretório compartilhado entre os workers do host (SESSION_DIR),
+#           substituto local de um backend compartilhado (ex.: Redis)
+# Com vários workers do gunicorn use SESSION_BACKEND=file: o contador do servidor
+# é o que vale, o "context" enviado pelo cliente só inicializa uma sessão nova.
+# Outros backends só precisam implementar get/set/delete e entrar em BACKENDS.
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from json import dump, load
+from os import environ
+
+SESSION_BACKEND = environ.get("SESSION_BACKEND", "memory")
+SESSION_DIR = environ.get("SESSION_DIR", "/tmp/docentify-sessions")
+SESSION_TTL = int(environ.get("SESSION_TTL", "1800"))
+SESSION_MAX = int(environ.get("SESSION_MAX", "10000"))
+MAX_HISTORICO = 10
+MAX_INTENCOES = 20
+
+
+class MemorySessionBackend:
+    def __init__(self, max_sessions=SESSION_MAX, ttl=SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessoes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._sessoes.get(key)
+            if item is None:
+                return None
+            expira, sessao = item
+            if expira <= time.time():
+                del self._sessoes[key]
+                return None
+            self._sessoes.move_to_end(key)
+            return sessao
+
+    def set(self, key, sessao):
+        with self._lock:
+            self._sessoes[key] = (time.time() + self.ttl, sessao)
+            self._sessoes.move_to_end(key)
+            while len(self._sessoes) > self.max_sessions:
+                self._sessoes.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._sessoes.pop(key, None)
+
+
+class FileSessionBackend:
+    def __init__(self, directory=SESSION_DIR, ttl=SESSION_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        # Só o usuário do serviço lê e escreve as sessões; o chmod também falha (e impede
+        # a subida) se o diretório já existir e pertencer a outro usuário
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        os.chmod(directory, 0o700)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path) as f:
+                return load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, sessao):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            dump(sessao, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+BACKENDS = {
+    "memory": MemorySessionBackend,
+    "file": FileSessionBackend,
+}
+
+backend = BACKENDS[SESSION_BACKEND]()
+
+
+def new_session(tentativas=0):
+    return {"tentativas": tentativas, "historico": [], "intencoes": {}}
+
+
+def get_session(user_email, contexto=None):
+    sessao = backend.get(user_email) if user_email else None
+    if sessao is None:
+        # Sessão nova (ou expirada): aproveita o contador que o cliente ainda envia
+        tentativas = (contexto or {}).get("tentativas")
+        sessao = new_session(tentativas if isinstance(tentativas, int) and not isinstance(tentativas, bool) else 0)
+    return sessao
+
+
+def save_session(user_email, sessao):
+    if not user_email:
+        return
+    sessao["historico"] = sessao["historico"][-MAX_HISTORICO:]
+    while len(sessao["intencoes"]) > MAX_INTENCOES:
+        sessao["intencoes"].pop(next(iter(sessao["intencoes"])))
+    backend.set(user_email, sessao)
+
+
+def normalize_question(pergunta):
+    return " ".join(pergunta.lower().split())
@@ -0,0 +1,250 @@
+COURSE_STUDENTS_QUERY = """
+    SELECT 
+        c.name AS Curso, 
+        i.name AS Instituicao,
+        COALESCE(COUNT(e.userId), 0) AS Total_Inscritos
+    FROM Courses c
+    LEFT JOIN Institutions i ON c.institutionId = i.id
+    LEFT JOIN Enrollments e ON c.id = e.courseId
+    WHERE i.id = %s
+    GROUP BY c.id, c.name, i.name
+    ORDER BY Total_Inscritos DESC;
+    """
+
+
+ACCUMULATED_PROGRESS_QUERY = """
+    SELECT 
+        U.id AS Usuario_ID,
+        U.name AS Nome,
+        C.id AS Curso_ID,
+        C.name AS Curso,
+        E.enrollmentDate AS Data_Inscricao,
+        UP.progressDate AS Data_Progresso,
+        I.id AS Instituicao_ID,
+        I.name AS Instituicao
+    FROM Users U
+    JOIN Enrollments E ON U.id = E.userId
+    JOIN Courses C ON E.courseId = C.id
+    JOIN Institutions I ON C.institutionId = I.id
+    LEFT JOIN UserProgress UP ON E.id = UP.enrollmentId
+    WHERE I.id = %s  -- 🚀 Substituir pelo ID da instituição desejada
+    ORDER BY UP.progressDate;
+    """
+
+
+COURSE_POPULARITY_QUERY = """
+    SELECT 
+        c.name AS Curso, 
+        COUNT(DISTINCT e.userId) AS Total_Finalizados
+    FROM Courses c
+    LEFT JOIN Enrollments e ON c.id = e.courseId
+    LEFT JOIN UserProgress up ON e.id = up.enrollmentId
+    JOIN Institutions i ON c.institutionId = i.id
+    WHERE i.id = %s
+    GROUP BY c.id, c.name;
+    """
+
+
+INDIVIDUAL_PROGRESS_QUERY = """
+    SELECT 
+        u.name AS Nome, 
+        c.name AS Curso, 
+        COUNT(up.stepId) AS Progresso
+    FROM Enrollments e
+    JOIN Users u ON e.userId = u.id
+    JOIN Courses c ON e.courseId = c.id
+    LEFT JOIN UserProgress up ON e.id = up.enrollmentId
+    WHERE c.institutionId = %s
+    GROUP BY u.id, u.name, c.id, c.name
+    ORDER BY u.name, c.name
+    """
+
+
+AVERAGE_PERFORMANCE_BY_COURSE_QUERY = """
+    WITH cursos AS (
+        SELECT id, name FROM Courses WHERE institutionId = %s
+    ),
+    etapas AS (
+        SELECT s.courseId, COUNT(s.id) AS Total_Etapas
+        FROM cursos c
+        JOIN Steps s ON s.courseId = c.id
+        GROUP BY s.courseId
+    ),
+    progresso AS (
+        SELECT e.courseId, COUNT(up.stepId) AS Total_Progresso
+        FROM cursos c
+        JOIN Enrollments e ON e.courseId = c.id
+        JOIN UserProgress up ON up.enrollmentId = e.id
+        GROUP BY e.courseId
+    )
+    SELECT 
+        c.name AS Curso,
+        (COALESCE(p.Total_Progresso, 0) / et.Total_Etapas) * 100 AS Media_Progresso
+    FROM cursos c
+    LEFT JOIN etapas et ON et.courseId = c.id
+    LEFT JOIN progresso p ON p.courseId = c.id
+    ORDER BY Media_Progresso DESC;
+    """
+
+
+PERFORMANCE_BENCHMARK_REPORT_QUERY = """
+        SELECT 
+            U.name AS Usuario, 
+            COUNT(UP.stepId) AS Etapas_Completadas
+        FROM Courses C
+        JOIN Enrollments E ON E.courseId = C.id
+        JOIN Users U ON U.id = E.userId
+        LEFT JOIN UserProgress UP ON E.id = UP.enrollmentId
+        WHERE C.institutionId = %s  -- Filtra por instituição
+        AND E.isActive = 1  -- Apenas inscrições ativas
+        GROUP BY U.id, U.name
+    """
+
+
+USER_GENDER_DISTRIBUTION_QUERY = """
+    SELECT U.gender, COUNT(*) AS Total_Usuarios
+    FROM Users U
+    JOIN Enrollments E ON U.id = E.userId
+    JOIN Courses C ON E.courseId = C.id
+    WHERE C.institutionId = %s  -- Filtra apenas os usuários da instituição específica
+    GROUP BY U.gender
+    """
+
+
+USER_ACTIVITY_OVER_WEEK_QUERY = """
+    SELECT 
+        U.name AS Usuario,
+        CASE 
+            WHEN DAYOFWEEK(UP.progressDate) = 1 THEN 'Domingo'
+            WHEN DAYOFWEEK(UP.progressDate) = 2 THEN 'Segunda-feira'
+            WHEN DAYOFWEEK(UP.progressDate) = 3 THEN 'Terça-feira'
+            WHEN DAYOFWEEK(UP.progressDate) = 4 THEN 'Quarta-feira'
+            WHEN DAYOFWEEK(UP.progressDate) = 5 THEN 'Quinta-feira'
+            WHEN DAYOFWEEK(UP.progressDate) = 6 THEN 'Sexta-feira'
+            WHEN DAYOFWEEK(UP.progressDate) = 7 THEN 'Sábado'
+        END AS Dia_Semana,
+        COUNT(*) AS Total_Atividades
+    FROM UserProgress UP
+    JOIN Enrollments E ON UP.enrollmentId = E.id
+    JOIN Users U ON E.userId = U.id
+    JOIN Courses C ON E.courseId = C.id
+    WHERE C.institutionId = %s
+    GROUP BY Usuario, Dia_Semana
+    ORDER BY Usuario, FIELD(Dia_Semana, 'Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira', 'Sábado', 'Domingo')
+    """
+
+
+COURSE_COMPLETION_REPORT_QUERY = """
+    SELECT i.name AS Instituicao, c.name AS Curso, COUNT(e.id) AS Total_Inscritos, 
+        COUNT(DISTINCT up.enrollmentId) AS Total_Concluidos
+    FROM Enrollments e
+    JOIN Courses c ON e.courseId = c.id
+    JOIN Institutions i ON c.institutionId = i.id
+    LEFT JOIN UserProgress up ON e.id = up.enrollmentId
+    WHERE i.id = %s
+    GROUP BY i.name, c.name
+    """
+
+
+FAVORITED_COURSES_QUERY = """
+    SELECT c.name AS Curso, COUNT(fc.userId) AS Total_Favoritos
+    FROM FavoritedCourses fc
+    JOIN Courses c ON fc.courseId = c.id
+    WHERE c.institutionId = %s
+    GROUP BY c.id, c.name
+    ORDER BY Total_Favoritos ASC 
+    """
+
+
+INCOMPLETE_STEPS_ANALYSIS_QUERY = """
+    WITH etapas AS (
+        SELECT s.id, s.title, s.courseId, c.name AS Curso
+        FROM Courses c
+        JOIN Steps s ON s.courseId = c.id
+        WHERE c.institutionId = %s
+    ),
+    inscritos AS (
+        SELECT e.courseId, COUNT(e.id) AS Total_Inscritos
+        FROM Enrollments e
+        WHERE e.courseId IN (SELECT courseId FROM etapas)
+        GROUP BY e.courseId
+    ),
+    concluidas AS (
+        SELECT up.stepId, COUNT(DISTINCT up.enrollmentId) AS Total_Concluidas
+        FROM etapas s
+        JOIN UserProgress up ON up.stepId = s.id
+        GROUP BY up.stepId
+    )
+    SELECT s.title AS Etapa, s.Curso, 
+        (COALESCE(i.Total_Inscritos, 0) - COALESCE(co.Total_Concluidas, 0)) AS Total_Nao_Completas
+    FROM etapas s
+    LEFT JOIN inscritos i ON i.courseId = s.courseId
+    LEFT JOIN concluidas co ON co.stepId = s.id
+    """
+
+
+ACTIVITY_PERFORMANCE_QUERY = """
+    SELECT c.name AS Curso, 
+        a.allowedAttempts AS Tentativas_Permitidas, 
+        AVG(at.score) AS Media_Pontuacao, 
+        COUNT(at.id) AS Total_Tentativas
+    FROM Activities a
+    JOIN Steps s ON a.stepId = s.id
+    JOIN Courses c ON s.courseId = c.id
+    LEFT JOIN ActivityAttempts at ON a.id = at.activityId
+    WHERE c.institutionId = %s
+    GROUP BY c.id, c.name, a.allowedAttempts
+    """
+
+
+COMPLETED_STEPS_WITHIN_TIME_RATE_QUERY = """
+    SELECT c.name AS Curso, 
+        COUNT(CASE WHEN up.progressDate <= DATE_ADD(e.enrollmentDate, INTERVAL IFNULL(c.requiredTimeLimit, 0) DAY) THEN 1 END) AS Dentro_Prazo,
+        COUNT(up.stepId) AS Total_Atividades
+    FROM Courses c
+    LEFT JOIN Enrollments e ON e.courseId = c.id
+    LEFT JOIN UserProgress up ON e.id = up.enrollmentId
+    WHERE c.institutionId = %s
+    GROUP BY c.id, c.name
+    ORDER BY Dentro_Prazo DESC
+    """
+
+
+PROGRESSO_QUERY = '''
+        SELECT c.name, COUNT(up.stepId)
+        FROM UserProgress up 
+        JOIN Enrollments e ON up.enrollmentId = e.id
+        JOIN Users u ON e.userId = u.id
+        JOIN Courses c ON e.courseId = c.id
+        WHERE u.email = %s GROUP BY c.name'''
+
+
+CERTIFICADO_QUERY = '''
+        SELECT c.name 
+        FROM Courses c 
+        JOIN Enrollments e ON c.id = e.courseId 
+        JOIN Users u ON e.userId = u.id
+        WHERE u.email = %s AND e.isActive = 1'''
+
+
+# Registro de todas as consultas executadas pelo serviço, usado por explain_queries.py
+GRAPH_QUERIES = {
+    "course_students": COURSE_STUDENTS_QUERY,
+    "accumulated_progress": ACCUMULATED_PROGRESS_QUERY,
+    "course_popularity": COURSE_POPULARITY_QUERY,
+    "individual_progress": INDIVIDUAL_PROGRESS_QUERY,
+    "average_performance_by_course": AVERAGE_PERFORMANCE_BY_COURSE_QUERY,
+    "performance_benchmark_report": PERFORMANCE_BENCHMARK_REPORT_QUERY,
+    "user_gender_distribution": USER_GENDER_DISTRIBUTION_QUERY,
+    "user_activity_over_week": USER_ACTIVITY_OVER_WEEK_QUERY,
+    "course_completion_report": COURSE_COMPLETION_REPORT_QUERY,
+    "favorited_courses": FAVORITED_COURSES_QUERY,
+    "incomplete_steps_analysis": INCOMPLETE_STEPS_ANALYSIS_QUERY,
+    "activity_performance": ACTIVITY_PERFORMANCE_QUERY,
+    "completed_steps_within_time_rate": COMPLETED_STEPS_WITHIN_TIME_RATE_QUERY,
+}
+
+CHATBOT_QUERIES = {
+    "progresso": PROGRESSO_QUERY,
+    "certificado": CERTIFICADO_QUERY,
+}
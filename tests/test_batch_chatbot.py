@@ -0,0 +1,98 @@
+import io
+from json import dumps, loads
+
+import pytest
+
+batch_chatbot = pytest.importorskip("batch_chatbot")
+
+
+def classificar_em_lote_falso(perguntas, batch_size=256, n_process=1, bert_batch_size=32):
+    # Mesmo contrato de chatbot.classificar_em_lote: lotes de (pergunta, intencao, camada)
+    lote = []
+    for pergunta in perguntas:
+        lote.append((pergunta, "certificado", "lematizacao") if "certificado" in pergunta else (pergunta, None, None))
+        if len(lote) == batch_size:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+@pytest.fixture(autouse=True)
+def sem_modelos(monkeypatch):
+    monkeypatch.setattr(batch_chatbot, "classificar_em_lote", classificar_em_lote_falso)
+
+
+def linhas(corpo):
+    return list(batch_chatbot.linhas_do_arquivo(io.BytesIO(corpo)))
+
+
+def resultados(linhas_entrada, **kwargs):
+    return [loads(linha) for linha in batch_chatbot.classificar_jsonl(linhas_entrada, **kwargs)]
+
+
+def test_splits_lines_and_keeps_last_line_without_newline():
+    assert linhas(b'{"a": 1}\n\n{"b": "\xc3\xa9"}') == ['{"a": 1}', "", '{"b": "é"}']
+
+
+def test_rejects_long_lines_anywhere_in_the_body(monkeypatch):
+    monkeypatch.setattr(batch_chatbot, "MAX_LINE_BYTES", 10)
+    assert linhas(b"curta\n" + b"x" * 50 + b"\nok\n" + b"y" * 11) == ["curta", None, "ok", None]
+    # Exatamente no limite ainda é aceita, com ou sem quebra de linha
+    assert linhas(b"x" * 10 + b"\n" + b"y" * 10) == ["x" * 10, "y" * 10]
+
+
+def test_classifies_lines_and_reports_stats():
+    entrada = [
+        dumps({"user_message": "cadê meu certificado?", "id": "a1"}),
+        "",
+        "não é json",
+        dumps({"user_message": "oi"}),
+        None,
+    ]
+    *itens, fim = resultados(entrada, batch_size=1)
+
+    assert {"linha": 1, "user_message": "cadê meu certificado?", "intencao": "certificado", "camada": "lematizacao", "id": "a1"} in itens
+    assert {"linha": 4, "user_message": "oi", "intencao": None, "camada": None} in itens
+    assert sorted(item["linha"] for item in itens if "erro" in item) == [3, 5]
+    estatisticas = fim["estatisticas"]
+    assert estatisticas["total"] == 2
+    assert estatisticas["camadas"]["lematizacao"] == 1
+    assert estatisticas["camadas"]["nao_identificada"] == 1
+    assert estatisticas["invalidas"] == 2
+    assert estatisticas["limite_excedido"] is False
+
+
+def test_stops_at_max_lines():
+    entrada = [dumps({"user_message": str(i)}) for i in range(5)]
+    *itens, fim = resultados(entrada, max_linhas=3)
+
+    assert [item["linha"] for item in itens if "intencao" in item] == [1, 2, 3]
+    assert [item for item in itens if "erro" in item] == [{"linha": 4, "erro": "Limite de 3 linhas excedido; o restante foi ignorado"}]
+    assert fim["estatisticas"]["limite_excedido"] is True
+
+
+def test_endpoint_reads_chunked_body(monkeypatch):
+    testclient = pytest.importorskip("fastapi.testclient")
+    main = pytest.importorskip("main")
+    main.app.dependency_overrides[main.get_jwt_data] = lambda: {"email": "ana@docentify.com"}
+    try:
+        corpo = "".join(dumps({"user_message": f"certificado {i}", "id": i}) + "\n" for i in range(200)).encode()
+
+        def chunks():
+            # Chunks que cortam as linhas no meio
+            for inicio in range(0, len(corpo), 7):
+                yield corpo[inicio:inicio + 7]
+
+        resposta = testclient.TestClient(main.app).post("/chatbot/batch?batch_size=16", content=chunks())
+        *itens, fim = [loads(linha) for linha in resposta.text.splitlines()]
+
+        assert resposta.status_code == 200
+        assert [item["id"] for item in itens] == list(range(200))
+        assert all(item["user_message"] == f"certificado {item['id']}" for item in itens)
+        assert fim["estatisticas"]["total"] == 200
+
+        monkeypatch.setattr(batch_chatbot, "MAX_BATCH_BYTES", 100)
+        assert testclient.TestClient(main.app).post("/chatbot/batch", content=chunks()).status_code == 413
+    finally:
+        main.app.dependency_overrides.clear()
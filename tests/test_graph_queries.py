@@ -0,0 +1,124 @@
+# Resultados de referência das consultas reescritas em sql_queries.py
+#
+# Roda a SQL antiga (como estava em graphs.py) e a nova lado a lado sobre uma
+# base SQLite em memória. As três consultas só usam SQL portável; o único
+# ajuste é o placeholder (%s do pymysql -> ? do sqlite3).
+
+import sqlite3
+
+import pytest
+
+from sql_queries import (
+    AVERAGE_PERFORMANCE_BY_COURSE_QUERY,
+    INCOMPLETE_STEPS_ANALYSIS_QUERY,
+    PERFORMANCE_BENCHMARK_REPORT_QUERY,
+)
+
+OLD_AVERAGE_PERFORMANCE_BY_COURSE_QUERY = """
+    SELECT 
+        c.name AS Curso,
+        (COUNT(up.stepId) / (SELECT COUNT(s.id) FROM Steps s WHERE s.courseId = c.id)) * 100 AS Media_Progresso
+    FROM Courses c
+    LEFT JOIN Enrollments e ON c.id = e.courseId
+    LEFT JOIN UserProgress up ON e.id = up.enrollmentId
+    WHERE c.institutionId = %s
+    GROUP BY c.id, c.name
+    ORDER BY Media_Progresso DESC;
+    """
+
+# Antes filtrava institutionId = 3 fixo e ignorava o parâmetro
+OLD_PERFORMANCE_BENCHMARK_REPORT_QUERY = """
+        SELECT 
+            U.name AS Usuario, 
+            COUNT(UP.stepId) AS Etapas_Completadas
+        FROM Users U
+        JOIN Enrollments E ON U.id = E.userId
+        LEFT JOIN UserProgress UP ON E.id = UP.enrollmentId
+        WHERE E.isActive = 1  -- Apenas inscrições ativas
+        AND E.courseId IN (
+            SELECT id FROM Courses WHERE institutionId = 3  -- Filtra por instituição
+        )
+        GROUP BY U.id, U.name
+    """
+
+OLD_INCOMPLETE_STEPS_ANALYSIS_QUERY = """
+    SELECT s.title AS Etapa, c.name AS Curso, 
+        (COUNT(e.id) - COUNT(DISTINCT up.enrollmentId)) AS Total_Nao_Completas
+    FROM Steps s
+    JOIN Courses c ON s.courseId = c.id
+    LEFT JOIN UserProgress up ON s.id = up.stepId
+    LEFT JOIN Enrollments e ON e.courseId = s.courseId
+    WHERE c.institutionId = %s
+    GROUP BY s.id, s.title, c.id, c.name
+    """
+
+INSTITUICAO = 3
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(
+        """
+        CREATE TABLE Institutions (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE Courses (id INTEGER PRIMARY KEY, name TEXT, institutionId INTEGER);
+        CREATE TABLE Steps (id INTEGER PRIMARY KEY, title TEXT, courseId INTEGER);
+        CREATE TABLE Users (id INTEGER PRIMARY KEY, name TEXT, email TEXT);
+        CREATE TABLE Enrollments (id INTEGER PRIMARY KEY, userId INTEGER, courseId INTEGER, isActive INTEGER);
+        CREATE TABLE UserProgress (id INTEGER PRIMARY KEY, enrollmentId INTEGER, stepId INTEGER);
+
+        INSERT INTO Institutions VALUES (3, 'Docentify'), (4, 'Outra');
+        INSERT INTO Courses VALUES
+            (10, 'Python', 3), (11, 'SQL', 3), (12, 'Sem Etapas', 3), (20, 'Outro Curso', 4);
+        INSERT INTO Steps VALUES
+            (100, 'Introdução', 10), (101, 'Funções', 10), (102, 'Classes', 10),
+            (110, 'SELECT', 11), (200, 'Outra Etapa', 20);
+        INSERT INTO Users VALUES
+            (1, 'Ana', 'ana@x'), (2, 'Bruno', 'bruno@x'), (3, 'Carla', 'carla@x'), (4, 'Davi', 'davi@x');
+        INSERT INTO Enrollments VALUES
+            (1, 1, 10, 1), (2, 2, 10, 1), (3, 3, 10, 0), (4, 1, 11, 1), (5, 4, 20, 1);
+        -- Etapa 100: três linhas de progresso (uma repetida) e três inscrições no curso -> caso de fan-out
+        INSERT INTO UserProgress (enrollmentId, stepId) VALUES
+            (1, 100), (1, 100), (2, 100), (1, 101), (4, 110), (5, 200);
+        """
+    )
+    yield conn
+    conn.close()
+
+
+def run(conn, query, params=()):
+    return conn.execute(query.replace("%s", "?"), params).fetchall()
+
+
+def test_average_performance_by_course_unchanged(conn):
+    antigo = run(conn, OLD_AVERAGE_PERFORMANCE_BY_COURSE_QUERY, (INSTITUICAO,))
+    novo = run(conn, AVERAGE_PERFORMANCE_BY_COURSE_QUERY, (INSTITUICAO,))
+    assert sorted(novo, key=repr) == sorted(antigo, key=repr)
+    assert len(novo) == 3
+
+
+def test_performance_benchmark_report_unchanged(conn):
+    antigo = run(conn, OLD_PERFORMANCE_BENCHMARK_REPORT_QUERY)
+    novo = run(conn, PERFORMANCE_BENCHMARK_REPORT_QUERY, (INSTITUICAO,))
+    assert sorted(novo) == sorted(antigo) == [("Ana", 4), ("Bruno", 1)]
+
+
+def test_performance_benchmark_report_uses_institution_parameter(conn):
+    assert run(conn, PERFORMANCE_BENCHMARK_REPORT_QUERY, (4,)) == [("Davi", 1)]
+
+
+def test_incomplete_steps_analysis_counts_enrolled_minus_completed(conn):
+    novo = run(conn, INCOMPLETE_STEPS_ANALYSIS_QUERY, (INSTITUICAO,))
+    # inscritos no curso - inscrições distintas que concluíram a etapa
+    assert sorted(novo) == [
+        ("Classes", "Python", 3),
+        ("Funções", "Python", 2),
+        ("Introdução", "Python", 1),
+        ("SELECT", "SQL", 0),
+    ]
+
+
+def test_incomplete_steps_analysis_old_query_inflated_by_fan_out(conn):
+    antigo = dict(((etapa, curso), total) for etapa, curso, total in run(conn, OLD_INCOMPLETE_STEPS_ANALYSIS_QUERY, (INSTITUICAO,)))
+    # 3 linhas de progresso x 3 inscrições - 2 concluintes distintos
+    assert antigo[("Introdução", "Python")] == 7
@@ -0,0 +1,123 @@
+import hashlib
+import hmac
+import time
+from base64 import urlsafe_b64encode
+from json import dumps
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi import HTTPException
+
+import jwt_utils
+
+SEGREDO = "segredo-de-teste"
+
+
+def b64(data):
+    return urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def token_hs256(claims, segredo=SEGREDO, alg="HS256"):
+    header = b64(dumps({"alg": alg, "typ": "JWT"}).encode())
+    payload = b64(dumps(claims).encode())
+    assinatura = hmac.new(segredo.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"{header}.{payload}.{b64(assinatura)}"
+
+
+class FakeRequest:
+    def __init__(self, authorization=None):
+        self.headers = {"Authorization": authorization} if authorization is not None else {}
+
+
+@pytest.fixture(autouse=True)
+def limpar_cache(monkeypatch):
+    monkeypatch.delenv("JWT_SECRET", raising=False)
+    jwt_utils._signing_key.cache_clear()
+    jwt_utils._claims_cache.clear()
+    yield
+    jwt_utils._signing_key.cache_clear()
+    jwt_utils._claims_cache.clear()
+
+
+@pytest.fixture
+def com_segredo(monkeypatch):
+    monkeypatch.setenv("JWT_SECRET", SEGREDO)
+    jwt_utils._signing_key.cache_clear()
+
+
+def assert_401(token_ou_request, detalhe):
+    with pytest.raises(HTTPException) as erro:
+        if isinstance(token_ou_request, FakeRequest):
+            jwt_utils.get_jwt_data(token_ou_request)
+        else:
+            jwt_utils.decode_token(token_ou_request)
+    assert erro.value.status_code == 401
+    assert detalhe in erro.value.detail
+
+
+@pytest.mark.parametrize("authorization", [None, "", "Basic abc", "Bearer ", "Bearer " + "a" * 9000])
+def test_rejects_bad_authorization_header(authorization):
+    with pytest.raises(HTTPException) as erro:
+        jwt_utils.get_jwt_data(FakeRequest(authorization))
+    assert erro.value.status_code == 401
+
+
+def test_valid_hs256_token(com_segredo):
+    token = token_hs256({"email": "ana@docentify.com", "exp": time.time() + 60})
+    assert jwt_utils.get_jwt_data(FakeRequest(f"Bearer {token}"))["email"] == "ana@docentify.com"
+
+
+def test_rejects_bad_signature(com_segredo):
+    assert_401(token_hs256({"email": "ana@docentify.com"}, segredo="outro"), "Assinatura inválida")
+
+
+def test_rejects_other_algorithms(com_segredo):
+    assert_401(token_hs256({"email": "ana@docentify.com"}, alg="none"), "Algoritmo")
+
+
+def test_rejects_legacy_payload_when_secret_is_set(com_segredo):
+    assert_401(b64(dumps({"email": "ana@docentify.com"}).encode()), "malformado")
+
+
+def test_legacy_payload_only_token_without_secret():
+    token = b64(dumps({"email": "ana@docentify.com"}).encode())
+    assert jwt_utils.decode_token(token) == {"email": "ana@docentify.com"}
+
+
+@pytest.mark.parametrize("token", ["!!!", "a.b", b64(b"[1, 2]"), b64(b'{"exp": "amanha"}')])
+def test_rejects_malformed_tokens(token):
+    assert_401(token, "malformado")
+
+
+def test_rejects_expired_token_on_cache_miss(com_segredo):
+    assert_401(token_hs256({"email": "ana@docentify.com", "exp": time.time() - 1}), "expirado")
+    assert not jwt_utils._claims_cache
+
+
+def test_rejects_expired_token_on_cache_hit(com_segredo, monkeypatch):
+    agora = time.time()
+    token = token_hs256({"email": "ana@docentify.com", "exp": agora + 10})
+    jwt_utils.decode_token(token)
+    assert token in jwt_utils._claims_cache
+
+    monkeypatch.setattr(jwt_utils.time, "time", lambda: agora + 20)
+    assert_401(token, "expirado")
+    assert token not in jwt_utils._claims_cache
+
+
+def test_cache_hit_skips_verification(com_segredo, monkeypatch):
+    token = token_hs256({"email": "ana@docentify.com"})
+    jwt_utils.decode_token(token)
+    monkeypatch.setattr(jwt_utils, "_decode_token", lambda token: pytest.fail("token decodificado de novo"))
+    assert jwt_utils.decode_token(token)["email"] == "ana@docentify.com"
+
+
+def test_cache_evicts_least_recently_used(com_segredo, monkeypatch):
+    monkeypatch.setattr(jwt_utils, "JWT_CACHE_SIZE", 2)
+    a, b, c = (token_hs256({"email": f"{nome}@docentify.com"}) for nome in "abc")
+    jwt_utils.decode_token(a)
+    jwt_utils.decode_token(b)
+    jwt_utils.decode_token(a)  # a passa a ser o mais recente
+    jwt_utils.decode_token(c)
+    assert list(jwt_utils._claims_cache) == [a, c]
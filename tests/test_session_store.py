@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+import session_store
+from session_store import FileSessionBackend, MemorySessionBackend
+
+
+class Relogio:
+    def __init__(self, agora=1000.0):
+        self.agora = agora
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(session_store.time, "time", relogio)
+    return relogio
+
+
+@pytest.fixture
+def memoria(monkeypatch):
+    backend = MemorySessionBackend(max_sessions=10, ttl=60)
+    monkeypatch.setattr(session_store, "backend", backend)
+    return backend
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemorySessionBackend(max_sessions=2, ttl=60)
+    backend.set("a", {"n": 1})
+    backend.set("b", {"n": 2})
+    backend.get("a")  # a passa a ser o mais recente
+    backend.set("c", {"n": 3})
+    assert backend.get("b") is None
+    assert backend.get("a") == {"n": 1}
+    assert backend.get("c") == {"n": 3}
+
+
+def test_memory_backend_expires_sessions(relogio):
+    backend = MemorySessionBackend(max_sessions=10, ttl=60)
+    backend.set("a", {"n": 1})
+    relogio.agora += 59
+    assert backend.get("a") == {"n": 1}
+    relogio.agora += 1
+    assert backend.get("a") is None
+    assert "a" not in backend._sessoes
+
+
+def test_file_backend_round_trips_json(tmp_path):
+    backend = FileSessionBackend(directory=str(tmp_path / "sessoes"), ttl=60)
+    sessao = {"tentativas": 2, "historico": [{"pergunta": "olá", "intencao": None}], "intencoes": {"olá": "saudacao"}}
+    backend.set("ana@docentify.com", sessao)
+    assert backend.get("ana@docentify.com") == sessao
+    assert os.stat(tmp_path / "sessoes").st_mode & 0o777 == 0o700
+    backend.delete("ana@docentify.com")
+    assert backend.get("ana@docentify.com") is None
+
+
+def test_file_backend_expires_sessions(tmp_path):
+    backend = FileSessionBackend(directory=str(tmp_path), ttl=60)
+    backend.set("ana@docentify.com", {"tentativas": 1})
+    path = backend._path("ana@docentify.com")
+    antigo = os.path.getmtime(path) - 61
+    os.utime(path, (antigo, antigo))
+    assert backend.get("ana@docentify.com") is None
+    assert not os.path.exists(path)
+
+
+def test_file_backend_ignores_corrupted_sessions(tmp_path):
+    backend = FileSessionBackend(directory=str(tmp_path), ttl=60)
+    with open(backend._path("ana@docentify.com"), "w") as f:
+        f.write("{nao e json")
+    assert backend.get("ana@docentify.com") is None
+
+
+def test_save_session_trims_history_and_intents(memoria):
+    sessao = session_store.new_session()
+    sessao["historico"] = [{"pergunta": str(i)} for i in range(session_store.MAX_HISTORICO + 5)]
+    sessao["intencoes"] = {str(i): "saudacao" for i in range(session_store.MAX_INTENCOES + 5)}
+    session_store.save_session("ana@docentify.com", sessao)
+
+    salva = memoria.get("ana@docentify.com")
+    assert [item["pergunta"] for item in salva["historico"]] == [str(i) for i in range(5, session_store.MAX_HISTORICO + 5)]
+    # As intenções mais antigas saem primeiro
+    assert list(salva["intencoes"]) == [str(i) for i in range(5, session_store.MAX_INTENCOES + 5)]
+
+
+def test_save_session_without_email_is_not_stored(memoria):
+    session_store.save_session(None, session_store.new_session())
+    assert not memoria._sessoes
+
+
+def test_client_counter_only_seeds_new_sessions(memoria):
+    sessao = session_store.get_session("ana@docentify.com", {"tentativas": 2})
+    assert sessao["tentativas"] == 2
+    sessao["tentativas"] = 3
+    session_store.save_session("ana@docentify.com", sessao)
+
+    # Sessão existente: o contador do servidor prevalece sobre o enviado pelo cliente
+    assert session_store.get_session("ana@docentify.com", {"tentativas": 0})["tentativas"] == 3
+
+
+@pytest.mark.parametrize("contexto", [None, {}, {"tentativas": "2"}, {"tentativas": True}])
+def test_new_session_ignores_invalid_client_counter(memoria, contexto):
+    assert session_store.get_session("ana@docentify.com", contexto)["tentativas"] == 0